@@ -0,0 +1,84 @@
+# Micro-benchmarks for tuning the app's performance knobs.
+# Usage: python benchmarks.py [hashing] [imports]
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import app
+
+
+def _timed(fn, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def bench_hashing(rounds=5):
+    # Pick the largest N whose login latency is still acceptable (~100-250 ms)
+    password = "correct horse battery staple"
+    print(f"{'scheme':<28}{'hash ms':>10}{'verify ms':>12}{'memory':>10}")
+    for n in (2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16):
+        hashed = app.make_hashes(password, n=n)
+        hash_ms = _timed(lambda: app.make_hashes(password, n=n), rounds)
+        verify_ms = _timed(lambda: app.check_hashes(password, hashed), rounds)
+        memory_mib = 128 * n * app.SCRYPT_R / 2 ** 20
+        label = f"scrypt n={n} r={app.SCRYPT_R} p={app.SCRYPT_P}"
+        print(f"{label:<28}{hash_ms:>10.1f}{verify_ms:>12.1f}{memory_mib:>8.0f}MiB")
+    legacy = app.hashlib.sha256(password.encode()).hexdigest()
+    print(f"{'legacy sha256':<28}{'':>10}{_timed(lambda: app.check_hashes(password, legacy), rounds):>12.3f}")
+
+
+ROOT = Path(__file__).resolve().parent
+# Imported inside functions by app.py and reports.py rather than at startup
+FUNCTION_LEVEL_IMPORTS = ("plotly.subplots", "sklearn.linear_model", "streamlit_extras.metric_cards",
+                          "matplotlib.figure", "fpdf")
+# Every LazyModule target in app.py, so the list can't drift from what the app defers
+HEAVY_MODULES = tuple(module._name for module in vars(app).values()
+                      if isinstance(module, app.LazyModule)) + FUNCTION_LEVEL_IMPORTS
+
+
+def _import_cost(statement):
+    # Fresh interpreter per sample so nothing is already in sys.modules
+    code = ("import resource, time; start = time.perf_counter(); " + statement +
+            "; print((time.perf_counter() - start) * 1000, "
+            "resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+                            text=True, check=True)
+    elapsed_ms, max_rss_kib = result.stdout.split()[-2:]
+    return float(elapsed_ms), int(max_rss_kib) / 1024
+
+
+def bench_imports(rounds=3):
+    print(f"{'import':<28}{'ms':>10}{'peak RSS':>12}")
+    targets = [("app (cold start)", "import app")]
+    targets += [(name, f"import {name}") for name in HEAVY_MODULES]
+    for label, statement in targets:
+        samples = [_import_cost(statement) for _ in range(rounds)]
+        elapsed_ms = statistics.median(sample[0] for sample in samples)
+        rss_mib = statistics.median(sample[1] for sample in samples)
+        print(f"{label:<28}{elapsed_ms:>10.1f}{rss_mib:>10.1f}MiB")
+
+
+BENCHMARKS = {
+    "hashing": bench_hashing,
+    "imports": bench_imports,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run app micro-benchmarks")
+    parser.add_argument("names", nargs="*", metavar="name",
+                        help=f"benchmarks to run (default: all of {', '.join(BENCHMARKS)})")
+    args = parser.parse_args()
+    unknown = set(args.names) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"unknown benchmark(s): {', '.join(sorted(unknown))}")
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
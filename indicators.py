@@ -0,0 +1,266 @@
+# Technical indicators and downsampling for the Stock Insights charts, computed
+# with NumPy on OHLCV arrays. Every indicator can resume from the state left by a
+# previous run, so IndicatorCache only computes the bars appended since it last saw
+# a series instead of the whole history. Nothing here imports pandas or Streamlit.
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+BAR_FIELDS = ("open", "high", "low", "close", "volume")
+# Recursive filters are evaluated in blocks so decay ** k never underflows
+EWM_BLOCK = 64
+TRADING_DAYS = 252
+
+
+def index_to_ns(index):
+    # DatetimeIndex -> int64 nanoseconds in exchange-local wall time (what the charts display)
+    if getattr(index, "tz", None) is not None:
+        index = index.tz_localize(None)
+    return index.to_numpy().astype("datetime64[ns]").view(np.int64)
+
+
+def bars_from_history(hist):
+    # yfinance history frame -> dict of float64 arrays plus int64 timestamps
+    bars = {field: hist[field.capitalize()].to_numpy(dtype=np.float64) for field in BAR_FIELDS}
+    bars["time"] = index_to_ns(hist.index)
+    return bars
+
+
+def _ewm(x, alpha, prev):
+    # y[t] = alpha * x[t] + (1 - alpha) * y[t-1], seeded with y[-1] = prev
+    decay = 1.0 - alpha
+    if decay == 0:
+        return x.astype(np.float64, copy=True)
+    out = np.empty(len(x))
+    for start in range(0, len(x), EWM_BLOCK):
+        block = x[start:start + EWM_BLOCK]
+        powers = decay ** np.arange(1, len(block) + 1)
+        out[start:start + len(block)] = powers * (prev + np.cumsum(alpha * block / powers))
+        prev = out[start + len(block) - 1]
+    return out
+
+
+def _rolling(x, period, reduce):
+    out = np.full(len(x), np.nan)
+    if len(x) >= period:
+        out[period - 1:] = reduce(sliding_window_view(x, period), axis=1)
+    return out
+
+
+def _lookback(x, start, bars_needed):
+    # Slice that starts early enough for a window ending at `start`, plus the
+    # offset of `start` inside it
+    first = max(0, start - bars_needed)
+    return x[first:], start - first
+
+
+# Each indicator: fn(bars, start, state, **params) -> ({column: values for
+# bars[start:]}, state to resume from). state is None on a fresh series.
+
+def _sma(bars, start, state, period=20):
+    close, skip = _lookback(bars["close"], start, period - 1)
+    return {"sma": _rolling(close, period, np.mean)[skip:]}, state
+
+
+def _bollinger(bars, start, state, period=20, width=2.0):
+    close, skip = _lookback(bars["close"], start, period - 1)
+    mid = _rolling(close, period, np.mean)[skip:]
+    spread = width * _rolling(close, period, np.std)[skip:]
+    return {"bb_mid": mid, "bb_upper": mid + spread, "bb_lower": mid - spread}, state
+
+
+def _ema(bars, start, state, period=20):
+    close = bars["close"][start:]
+    ema = _ewm(close, 2 / (period + 1), state["ema"] if state else close[0])
+    return {"ema": ema}, {"ema": ema[-1]}
+
+
+def _rsi(bars, start, state, period=14):
+    # Wilder smoothing of gains and losses
+    close = bars["close"][start:]
+    delta = np.diff(close, prepend=state["close"] if state else close[0])
+    alpha = 1 / period
+    gain = _ewm(np.clip(delta, 0, None), alpha, state["gain"] if state else 0.0)
+    loss = _ewm(np.clip(-delta, 0, None), alpha, state["loss"] if state else 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = 100 * gain / (gain + loss)
+    return {"rsi": rsi}, {"close": close[-1], "gain": gain[-1], "loss": loss[-1]}
+
+
+def _macd(bars, start, state, fast=12, slow=26, signal=9):
+    close = bars["close"][start:]
+    fast_ema = _ewm(close, 2 / (fast + 1), state["fast"] if state else close[0])
+    slow_ema = _ewm(close, 2 / (slow + 1), state["slow"] if state else close[0])
+    macd = fast_ema - slow_ema
+    signal_line = _ewm(macd, 2 / (signal + 1), state["signal"] if state else macd[0])
+    return ({"macd": macd, "macd_signal": signal_line, "macd_hist": macd - signal_line},
+            {"fast": fast_ema[-1], "slow": slow_ema[-1], "signal": signal_line[-1]})
+
+
+def _atr(bars, start, state, period=14):
+    high, low, close = (bars[field][start:] for field in ("high", "low", "close"))
+    prev_close = np.concatenate(([state["close"] if state else close[0]], close[:-1]))
+    true_range = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    atr = _ewm(true_range, 1 / period, state["atr"] if state else true_range[0])
+    return {"atr": atr}, {"close": close[-1], "atr": atr[-1]}
+
+
+def _vwap(bars, start, state):
+    # Anchored at the first bar of the series
+    high, low, close, volume = (bars[field][start:] for field in ("high", "low", "close", "volume"))
+    price_volume = np.cumsum((high + low + close) / 3 * volume) + (state["pv"] if state else 0.0)
+    total_volume = np.cumsum(volume) + (state["volume"] if state else 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = price_volume / total_volume
+    return {"vwap": vwap}, {"pv": price_volume[-1], "volume": total_volume[-1]}
+
+
+# Name -> (function, default params, drawn over the price chart?)
+INDICATORS = {
+    "SMA": (_sma, {"period": 20}, True),
+    "EMA": (_ema, {"period": 20}, True),
+    "Bollinger Bands": (_bollinger, {"period": 20, "width": 2.0}, True),
+    "VWAP": (_vwap, {}, True),
+    "RSI": (_rsi, {"period": 14}, False),
+    "MACD": (_macd, {"fast": 12, "slow": 26, "signal": 9}, False),
+    "ATR": (_atr, {"period": 14}, False),
+}
+
+
+def compute(name, bars, **params):
+    fn, defaults, _ = INDICATORS[name]
+    if not len(bars["close"]):
+        return {}
+    return fn(bars, 0, None, **{**defaults, **params})[0]
+
+
+class _Entry:
+    __slots__ = ("settled", "settled_time", "settled_close", "state", "values")
+
+
+class IndicatorCache:
+    # Memoizes indicator columns per (symbol, interval, first bar, indicator, params).
+    # The newest bar may still be forming, so the saved state stops one bar short
+    # ("settled") and the last bar is recomputed on every call; when bars are
+    # appended only the new tail is computed and concatenated.
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, symbol, interval, name, bars, **params):
+        fn, defaults, _ = INDICATORS[name]
+        params = {**defaults, **params}
+        times, close = bars["time"], bars["close"]
+        n = len(close)
+        if not n:
+            return {}
+        key = (symbol, interval, int(times[0]), name, tuple(sorted(params.items())))
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+        settled = n - 1
+        if (entry is not None and 0 < entry.settled <= settled
+                and times[entry.settled - 1] == entry.settled_time
+                and close[entry.settled - 1] == entry.settled_close):
+            start, state = entry.settled, entry.state
+            values = {column: array[:start] for column, array in entry.values.items()}
+        else:
+            start, state, values = 0, None, None
+
+        if start < settled:
+            settled_bars = {field: array[:settled] for field, array in bars.items()}
+            tail, state = fn(settled_bars, start, state, **params)
+            values = tail if values is None else {
+                column: np.concatenate((values[column], tail[column])) for column in tail}
+        last, _ = fn(bars, settled, state, **params)
+        values = last if values is None else {
+            column: np.concatenate((values[column], last[column])) for column in last}
+
+        if settled:
+            fresh = _Entry()
+            fresh.settled, fresh.state, fresh.values = settled, state, values
+            fresh.settled_time, fresh.settled_close = times[settled - 1], close[settled - 1]
+            with self._lock:
+                self._entries[key] = fresh
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return values
+
+
+def _bucket_bounds(n, max_bars):
+    starts = np.arange(0, n, -(-n // max_bars))
+    return starts, np.append(starts[1:], n) - 1
+
+
+def ohlc_buckets(bars, max_bars):
+    # Merges runs of consecutive bars so at most max_bars remain; each bucket keeps
+    # the first open, highest high, lowest low, last close and total volume
+    n = len(bars["close"])
+    if n <= max_bars:
+        return bars
+    starts, ends = _bucket_bounds(n, max_bars)
+    return {
+        "time": bars["time"][starts],
+        "open": bars["open"][starts],
+        "high": np.fmax.reduceat(bars["high"], starts),
+        "low": np.fmin.reduceat(bars["low"], starts),
+        "close": bars["close"][ends],
+        "volume": np.add.reduceat(bars["volume"], starts),
+    }
+
+
+def bucket_last(values, max_bars):
+    # Value at the end of each ohlc_buckets bucket, for series drawn against the candles
+    if len(values) <= max_bars:
+        return values
+    return values[_bucket_bounds(len(values), max_bars)[1]]
+
+
+def lttb(x, y, max_points):
+    # Largest-Triangle-Three-Buckets: keeps the first and last points and, per
+    # bucket, the point forming the largest triangle with the previously kept point
+    # and the next bucket's average, which preserves peaks and troughs
+    finite = np.isfinite(y)
+    x, y = x[finite], y[finite]
+    n = len(x)
+    if n <= max_points or max_points < 3:
+        return x, y
+    xf = x.astype(np.float64)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    keep = np.empty(max_points, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    prev = 0
+    for i in range(max_points - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_hi = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = xf[hi:next_hi].mean(), y[hi:next_hi].mean()
+        area = np.abs((xf[prev] - avg_x) * (y[lo:hi] - y[prev]) - (xf[prev] - xf[lo:hi]) * (avg_y - y[prev]))
+        prev = lo + int(np.argmax(area))
+        keep[i + 1] = prev
+    return x[keep], y[keep]
+
+
+def compare_closes(closes):
+    # closes: (days x symbols) aligned on one calendar with no gaps. Returns the
+    # series rebased to 100 plus per-symbol stats and the return correlation matrix.
+    rebased = closes / closes[0] * 100
+    returns = np.diff(np.log(closes), axis=0)
+    total_return = rebased[-1] / 100 - 1
+    drawdown = closes / np.maximum.accumulate(closes, axis=0) - 1
+    return {
+        "rebased": rebased,
+        "total_return": total_return,
+        # Versus an equal-weight basket of the compared symbols
+        "relative_return": total_return - total_return.mean(),
+        "volatility": returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS) if len(returns) > 1
+        else np.full(closes.shape[1], np.nan),
+        "max_drawdown": drawdown.min(axis=0),
+        "correlation": np.corrcoef(returns, rowvar=False) if len(returns) > 1
+        else np.full((closes.shape[1],) * 2, np.nan),
+    }
@@ -0,0 +1,79 @@
+# Local stand-in for the Gemini generateContent endpoint, for load and failure testing.
+# Usage: python mock_llm_server.py [--port 8765] [--latency 0.5] [--error-rate 0.2]
+# then:  GEMINI_BASE_URL=http://127.0.0.1:8765/v1beta streamlit run app.py
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ENDPOINT = re.compile(r"^/v1beta/models/(?P<model>[\w.\-]+):generateContent$")
+
+
+class MockGeminiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+    latency = 0.0
+    error_rate = 0.0
+    requests_served = 0
+    counter_lock = threading.Lock()
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        with self.counter_lock:
+            MockGeminiHandler.requests_served += 1
+            served = MockGeminiHandler.requests_served
+        match = ENDPOINT.match(self.path.split("?")[0])
+        if not match:
+            self._send_json(404, {"error": {"code": 404, "message": f"Unknown path {self.path}"}})
+            return
+        if not self.headers.get("x-goog-api-key"):
+            self._send_json(403, {"error": {"code": 403, "message": "Missing API key"}})
+            return
+        time.sleep(self.latency)
+        if random.random() < self.error_rate:
+            status = random.choice((429, 503))
+            self._send_json(status, {"error": {"code": status, "message": "Injected failure"}},
+                            headers={"Retry-After": "1"} if status == 429 else None)
+            return
+        try:
+            prompt = json.loads(body)["contents"][-1]["parts"][0]["text"]
+        except (ValueError, KeyError, IndexError):
+            self._send_json(400, {"error": {"code": 400, "message": "Malformed request body"}})
+            return
+        text = (f"[mock {match['model']} #{served}] Here is some general guidance based on "
+                f"your question. Prompt was {len(prompt)} characters: {prompt[:120]}")
+        self._send_json(200, {"candidates": [{"content": {"role": "model", "parts": [{"text": text}]},
+                                              "finishReason": "STOP"}]})
+
+    def log_message(self, format, *args):
+        print(f"{self.address_string()} {format % args}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a mock Gemini API server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds to wait before answering")
+    parser.add_argument("--error-rate", type=float, default=0.0,
+                        help="fraction of requests answered with 429/503")
+    args = parser.parse_args()
+    MockGeminiHandler.latency = args.latency
+    MockGeminiHandler.error_rate = args.error_rate
+    server = ThreadingHTTPServer((args.host, args.port), MockGeminiHandler)
+    print(f"Mock Gemini API on http://{args.host}:{args.port}/v1beta")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
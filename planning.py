@@ -0,0 +1,139 @@
+# Long-horizon planning maths for the Financial Advice tab. Pure NumPy with no
+# Streamlit or pandas, so it is cheap to import and safe to run in worker processes.
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+# Return assumptions used to turn the profile's risk allocation into a default
+SAFE_RETURN = 0.07
+EQUITY_RETURN = 0.12
+DEFAULT_INFLATION = 0.06
+
+# Goal -> default horizon and target in today's rupees
+GOAL_PRESETS = {
+    "Retirement": {"years": 25, "target": 30_000_000},
+    "House": {"years": 10, "target": 5_000_000},
+    "Child's Education": {"years": 15, "target": 2_500_000},
+}
+
+
+def expected_return(risk_percentage):
+    share = min(max(risk_percentage, 0), 100) / 100
+    return SAFE_RETURN * (1 - share) + EQUITY_RETURN * share
+
+
+def monthly_rate(annual_rate):
+    return (1 + np.asarray(annual_rate, dtype=np.float64)) ** (1 / 12) - 1
+
+
+def _annuity_factor(rate, months):
+    # Future value of 1 paid at the end of every month; `rate` broadcasts against `months`
+    with np.errstate(invalid="ignore", divide="ignore"):
+        factor = ((1 + rate) ** months - 1) / rate
+    return np.where(rate == 0, months, factor)
+
+
+def project_savings(current, monthly_sip, annual_returns, months):
+    # Balance after each month for every return scenario at once: (scenarios x months + 1)
+    rate = monthly_rate(annual_returns)[:, None]
+    t = np.arange(months + 1)
+    return current * (1 + rate) ** t + monthly_sip * _annuity_factor(rate, t)
+
+
+def required_sip(target, current, annual_returns, months):
+    # Monthly SIP that grows `current` to `target` in `months`, per scenario (closed form)
+    rate = monthly_rate(annual_returns)
+    if months <= 0:
+        return np.zeros_like(rate)
+    shortfall = target - current * (1 + rate) ** months
+    return np.maximum(shortfall / _annuity_factor(rate, months), 0)
+
+
+def plan_goal(target_today, years, current, monthly_sip, annual_returns, inflation=DEFAULT_INFLATION):
+    months = int(round(years * 12))
+    annual_returns = np.asarray(annual_returns, dtype=np.float64)
+    target = target_today * (1 + inflation) ** years
+    paths = project_savings(current, monthly_sip, annual_returns, months)
+    return {
+        "months": months,
+        "target": target,
+        "paths": paths,
+        "final": paths[:, -1],
+        "required_sip": required_sip(target, current, annual_returns, months),
+        "on_track": paths[:, -1] >= target,
+    }
+
+
+# Monte Carlo retirement simulation: yearly equity returns are bootstrapped from
+# overlapping one-year windows of index history and blended with a fixed safe
+# return by the profile's risk allocation
+TRADING_DAYS = 252
+SIMULATION_PATHS = 10_000
+SIMULATION_WORKERS = 4
+PERCENTILES = (5, 25, 50, 75, 95)
+
+
+def rolling_annual_returns(closes, window=TRADING_DAYS):
+    closes = np.asarray(closes, dtype=np.float64)
+    closes = closes[np.isfinite(closes)]
+    if len(closes) <= window:
+        return np.empty(0)
+    return closes[window:] / closes[:-window] - 1
+
+
+def retirement_cashflows(age, retire_age, end_age, annual_contribution, annual_spending, inflation):
+    # Contributions until retirement, withdrawals after; both grow with inflation
+    years = np.arange(max(end_age - age, 0))
+    inflate = (1 + inflation) ** years
+    return np.where(age + years < retire_age, annual_contribution, -annual_spending) * inflate
+
+
+def simulate_balances(returns_pool, cashflows, start_balance, equity_share, safe_return, n_paths, seed=None,
+                      dtype=np.float64):
+    # (paths x years + 1) nominal balances; a depleted path stays at zero
+    rng = np.random.default_rng(seed)
+    equity = rng.choice(np.asarray(returns_pool, dtype=np.float64), size=(n_paths, len(cashflows)))
+    growth = 1 + equity_share * equity + (1 - equity_share) * safe_return
+    balances = np.empty((n_paths, len(cashflows) + 1), dtype=dtype)
+    balances[:, 0] = start_balance
+    for year, cashflow in enumerate(cashflows):
+        balances[:, year + 1] = np.maximum(balances[:, year] * growth[:, year] + cashflow, 0)
+    return balances
+
+
+def _simulate_chunk(chunk_args):
+    return simulate_balances(**chunk_args)
+
+
+def new_simulation_pool(max_workers=SIMULATION_WORKERS):
+    # spawn: forking the threaded Streamlit server is not safe
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def simulate_retirement(returns_pool, age, retire_age, end_age, savings, annual_contribution, annual_spending,
+                        risk_percentage, inflation=DEFAULT_INFLATION, safe_return=SAFE_RETURN,
+                        n_paths=SIMULATION_PATHS, seed=None, pool=None, workers=SIMULATION_WORKERS):
+    cashflows = retirement_cashflows(age, retire_age, end_age, annual_contribution, annual_spending, inflation)
+    sim_args = {"returns_pool": returns_pool, "cashflows": cashflows, "start_balance": savings,
+                "equity_share": min(max(risk_percentage, 0), 100) / 100, "safe_return": safe_return}
+    if pool is None:
+        balances = simulate_balances(**sim_args, n_paths=n_paths, seed=seed)
+    else:
+        # Independent streams per chunk; float32 halves what comes back over the pipe
+        sizes = [n_paths // workers + (i < n_paths % workers) for i in range(workers)]
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        chunks = [{**sim_args, "n_paths": size, "seed": chunk_seed, "dtype": np.float32}
+                  for size, chunk_seed in zip(sizes, seeds) if size]
+        balances = np.concatenate(list(pool.map(_simulate_chunk, chunks)))
+
+    # Bands are reported in today's rupees
+    real = balances / (1 + inflation) ** np.arange(balances.shape[1])
+    retire_index = min(max(retire_age - age, 0), len(cashflows))
+    return {
+        "ages": age + np.arange(balances.shape[1]),
+        "bands": dict(zip(PERCENTILES, np.percentile(real, PERCENTILES, axis=0))),
+        "success_probability": float(np.mean(balances[:, -1] > 0)),
+        "median_at_retirement": float(np.median(real[:, retire_index])),
+        "paths": len(balances),
+    }
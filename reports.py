@@ -0,0 +1,518 @@
+# PDF report generation for the Financial Advice tab.
+# Everything is built in memory and nothing here touches Streamlit or pyplot's
+# global state, so reports can be generated from any session thread at once.
+# fpdf and matplotlib are imported on first render: the Streamlit process only
+# needs ReportQueue and the section catalog, the worker processes do the drawing.
+import io
+import multiprocessing
+import os
+import threading
+import time
+import unicodedata
+import uuid
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timedelta
+
+# Charts are drawn at this size and scaled to their placement width in the PDF
+CHART_SIZE_IN = (6.4, 4.8)
+# Effective resolution of a chart at its printed size
+CHART_TARGET_PPI = 150
+MM_PER_INCH = 25.4
+REPORT_WORKERS = 2
+# Finished reports are dropped if nobody picks them up within this window
+REPORT_RESULT_TTL_SECONDS = 15 * 60
+
+# Section key -> title, in the order sections appear in the report
+REPORT_SECTIONS = {
+    "summary": "Financial Summary",
+    "advice": "AI-Generated Financial Advice",
+    "portfolio": "Portfolio Holdings",
+    "expenses": "Expense Breakdown by Month",
+    "credit": "Credit Score Projection",
+    "amortization": "Debt Amortization Schedule",
+}
+DEFAULT_SECTIONS = ("summary", "advice")
+
+# Unicode TTF for report text; defaults to the DejaVu Sans bundled with matplotlib.
+# REPORT_FALLBACK_FONTS (os.pathsep-separated TTFs, e.g. Noto Sans Devanagari)
+# covers scripts the main font lacks.
+REPORT_FONT_PATH = os.getenv("REPORT_FONT_PATH")
+REPORT_FALLBACK_FONTS = [path for path in os.getenv("REPORT_FALLBACK_FONTS", "").split(os.pathsep) if path]
+
+
+# ASCII stand-ins for characters the current font can't draw
+PDF_SUBSTITUTIONS = {
+    "\u20B9": "INR",  # Replace ₹ with INR
+    "\u2019": "'",  # Right single quote
+    "\u2018": "'",  # Left single quote
+    "\u201C": '"',  # Left double quote
+    "\u201D": '"',  # Right double quote
+    "\u2013": "-",  # En dash
+    "\u2014": "-",  # Em dash
+    "\u2022": "-",  # Bullet
+    "\u2026": "...",  # Ellipsis
+    "\u2212": "-",  # Minus sign
+}
+
+
+class PdfCharMap(dict):
+    # str.translate table that resolves each code point once (keep it, substitute
+    # it, NFKC-fold it or fall back to "?") and memoizes the answer, so long LLM
+    # text is sanitized in a single translate() pass
+    def __init__(self, supported):
+        super().__init__()
+        self._supported = supported
+
+    def __missing__(self, codepoint):
+        char = chr(codepoint)
+        if char in "\n\r\t" or self._supported(codepoint):
+            value = char
+        elif char in PDF_SUBSTITUTIONS:
+            value = PDF_SUBSTITUTIONS[char]
+        else:
+            folded = unicodedata.normalize("NFKC", char)
+            supported = folded != char and all(self._supported(ord(c)) for c in folded)
+            value = folded if supported else "?"
+        self[codepoint] = value
+        return value
+
+
+# Core PDF fonts (Arial/Helvetica) only cover latin-1
+LATIN1_CHAR_MAP = PdfCharMap(lambda codepoint: codepoint < 256)
+_unicode_char_maps = {}
+
+
+def normalize_pdf_text(text, char_map=LATIN1_CHAR_MAP):
+    return text if text.isascii() else text.translate(char_map)
+
+
+class ChartRenderer:
+    # Renders onto one reusable Agg figure and keeps an LRU of finished PNGs,
+    # so identical charts (same inputs, same placement) are rasterized once
+    def __init__(self, size_in=CHART_SIZE_IN, target_ppi=CHART_TARGET_PPI, cache_size=256):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        self.figure = Figure(figsize=size_in)
+        FigureCanvasAgg(self.figure)
+        self.target_ppi = target_ppi
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def dpi_for_width(self, width_mm):
+        # Enough pixels for target_ppi once the image is scaled to width_mm
+        placement_in = width_mm / MM_PER_INCH
+        return max(72, round(self.target_ppi * placement_in / self.figure.get_figwidth()))
+
+    def render(self, key, draw, width_mm):
+        cache_key = (key, width_mm)
+        with self._lock:
+            png = self._cache.get(cache_key)
+            if png is None:
+                self.figure.clear()
+                draw(self.figure.add_subplot())
+                img_buffer = io.BytesIO()
+                self.figure.savefig(img_buffer, format="png", dpi=self.dpi_for_width(width_mm))
+                png = img_buffer.getvalue()
+                self._cache[cache_key] = png
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            else:
+                self._cache.move_to_end(cache_key)
+        return io.BytesIO(png)
+
+
+_chart_renderer = None
+_chart_renderer_lock = threading.Lock()
+
+
+def get_chart_renderer():
+    global _chart_renderer
+    with _chart_renderer_lock:
+        if _chart_renderer is None:
+            _chart_renderer = ChartRenderer()
+    return _chart_renderer
+
+
+def create_financial_chart(income, savings, debt, expenses, width_mm=150):
+    labels = ["Income", "Savings", "Debt", "Expenses"]
+    values = [income, savings, debt, expenses]
+
+    def draw(ax):
+        ax.pie(values, labels=labels, autopct="%1.1f%%",
+               colors=["#4CAF50", "#2196F3", "#F44336", "#FFC107"])
+        ax.set_title("Financial Distribution")
+
+    key = ("financial_distribution", income, savings, debt, expenses)
+    return get_chart_renderer().render(key, draw, width_mm)
+
+
+def create_expense_chart(months, categories, totals, width_mm=170):
+    # totals[category][i] is the spend for months[i]
+    def draw(ax):
+        bottom = [0] * len(months)
+        for category in categories:
+            ax.bar(months, totals[category], bottom=bottom, label=category)
+            bottom = [b + v for b, v in zip(bottom, totals[category])]
+        ax.set_ylabel("Amount (INR)")
+        ax.set_title("Monthly Spending by Category")
+        ax.legend(fontsize=7)
+
+    key = ("expenses", tuple(months), tuple((c, tuple(totals[c])) for c in categories))
+    return get_chart_renderer().render(key, draw, width_mm)
+
+
+def create_credit_chart(projection, width_mm=170):
+    def draw(ax):
+        ax.plot(range(len(projection)), projection, marker="o", color="#1a237e")
+        ax.set_xlabel("Months from now")
+        ax.set_ylabel("CIBIL Score")
+        ax.set_title("12-Month Credit Score Projection")
+        ax.grid(alpha=0.3)
+
+    return get_chart_renderer().render(("credit", tuple(projection)), draw, width_mm)
+
+
+def amortization_schedule(principal, monthly_payment, annual_rate, max_months=600):
+    # Yields (month, payment, principal, interest, balance) one row at a time
+    monthly_rate = annual_rate / 100 / 12
+    balance = principal
+    month = 0
+    while balance > 0.005 and month < max_months:
+        interest = balance * monthly_rate
+        principal_paid = min(monthly_payment - interest, balance)
+        if principal_paid <= 0:
+            # Payment doesn't cover the interest; the debt never amortizes
+            return
+        balance -= principal_paid
+        month += 1
+        yield month, principal_paid + interest, principal_paid, interest, balance
+
+
+def _report_font_files():
+    # style -> TTF path for the main report font, or {} to use the core fonts
+    if REPORT_FONT_PATH:
+        return {"": REPORT_FONT_PATH} if os.path.exists(REPORT_FONT_PATH) else {}
+    try:
+        import matplotlib
+    except ImportError:
+        return {}
+    font_dir = os.path.join(matplotlib.get_data_path(), "fonts", "ttf")
+    files = {"": "DejaVuSans.ttf", "B": "DejaVuSans-Bold.ttf",
+             "I": "DejaVuSans-Oblique.ttf", "BI": "DejaVuSans-BoldOblique.ttf"}
+    paths = {style: os.path.join(font_dir, name) for style, name in files.items()}
+    if not os.path.exists(paths[""]):
+        return {}
+    return {style: path for style, path in paths.items() if os.path.exists(path)}
+
+
+def _new_pdf():
+    from fpdf import FPDF
+
+    class FinanceReportPDF(FPDF):
+        report_font = "Arial"
+        char_map = LATIN1_CHAR_MAP
+        # Last page a section wrote to; the report header alone doesn't count
+        section_page = None
+
+        def normalize(self, text):
+            return normalize_pdf_text(text, self.char_map)
+
+        def footer(self):
+            self.set_y(-15)
+            self.set_font(self.report_font, 'I', 8)
+            self.cell(0, 10, f"Generated on {datetime.now().strftime('%B %d, %Y at %I:%M %p')}"
+                             f"  |  Page {self.page_no()}", 0, 0, 'C')
+
+    pdf = FinanceReportPDF()
+    font_files = _report_font_files()
+    if font_files:
+        # Embed a Unicode font so ₹ and non-latin text render instead of "?"
+        for style in ("", "B", "I", "BI"):
+            pdf.add_font("ReportSans", style, font_files.get(style, font_files[""]))
+        families = ["ReportSans"]
+        for index, path in enumerate(REPORT_FALLBACK_FONTS):
+            pdf.add_font(f"ReportFallback{index}", "", path)
+            families.append(f"ReportFallback{index}")
+        if len(families) > 1:
+            pdf.set_fallback_fonts(families[1:], exact_match=False)
+        pdf.report_font = "ReportSans"
+        # Glyph coverage is fixed per font set, so the memoized table is shared
+        cache_key = (tuple(font_files.items()), tuple(REPORT_FALLBACK_FONTS))
+        if cache_key not in _unicode_char_maps:
+            cmaps = [pdf.fonts[family.lower()].cmap for family in families]
+            _unicode_char_maps[cache_key] = PdfCharMap(
+                lambda codepoint: any(codepoint in cmap for cmap in cmaps))
+        pdf.char_map = _unicode_char_maps[cache_key]
+    return pdf
+
+
+def _section_page(pdf):
+    # Page-sized sections start on a fresh page unless this one holds only the header
+    if pdf.section_page == pdf.page_no():
+        pdf.add_page()
+
+
+def _section_title(pdf, key):
+    pdf.set_font(pdf.report_font, 'B', 14)
+    pdf.cell(200, 10, REPORT_SECTIONS[key], ln=True)
+
+
+def _note(pdf, text):
+    pdf.set_font(pdf.report_font, 'I', 11)
+    pdf.cell(0, 10, text, ln=True)
+
+
+def _table(pdf, headers, widths, rows, row_height=8):
+    # Rows are written as they are produced; the header repeats after page breaks
+    def header():
+        pdf.set_font(pdf.report_font, 'B', 10)
+        pdf.set_fill_color(220, 220, 220)
+        for text, width in zip(headers, widths):
+            pdf.cell(width, row_height, text, border=1, fill=True)
+        pdf.ln(row_height)
+        pdf.set_font(pdf.report_font, size=10)
+
+    header()
+    for row in rows:
+        if pdf.will_page_break(row_height):
+            pdf.add_page()
+            header()
+        for text, width in zip(row, widths):
+            pdf.cell(width, row_height, pdf.normalize(str(text)), border=1)
+        pdf.ln(row_height)
+
+
+def _render_summary(pdf, data):
+    _section_title(pdf, "summary")
+    pdf.set_font(pdf.report_font, size=12)
+
+    # Add financial details with better formatting
+    col_width = 95
+    row_height = 10
+
+    # Header row
+    pdf.set_fill_color(220, 220, 220)
+    pdf.cell(col_width, row_height, "Category", border=1, fill=True)
+    pdf.cell(col_width, row_height, "Amount (INR)", border=1, fill=True, ln=True)
+
+    # Data rows
+    for field in ("income", "savings", "debt", "expenses"):
+        pdf.cell(col_width, row_height, field.title(), border=1)
+        pdf.cell(col_width, row_height, f"{data[field]:,.2f}", border=1, ln=True)
+
+    pdf.ln(15)
+
+    # Add Financial Chart straight from the PNG buffer (fpdf2 reads file-like objects)
+    pdf.set_font(pdf.report_font, 'B', 14)
+    pdf.cell(200, 10, "Financial Distribution", ln=True)
+    chart_width = 150
+    chart_image = create_financial_chart(data["income"], data["savings"], data["debt"], data["expenses"],
+                                         width_mm=chart_width)
+    pdf.image(chart_image, x=30, w=chart_width)
+    pdf.ln(10)
+
+
+def _render_advice(pdf, data):
+    _section_title(pdf, "advice")
+    pdf.set_font(pdf.report_font, size=12)
+    # Light gray background that grows with the text instead of a fixed 60mm box
+    pdf.set_fill_color(245, 245, 245)
+    pdf.multi_cell(0, 8, pdf.normalize(data["advice"]), fill=True)
+
+
+def _render_portfolio(pdf, data):
+    _section_page(pdf)
+    _section_title(pdf, "portfolio")
+    holdings = data["portfolio"]
+    if not holdings:
+        _note(pdf, "No holdings recorded.")
+        return
+
+    def rows():
+        for holding in holdings:
+            current_price = holding["current_price"]
+            if not isinstance(current_price, (int, float)):
+                current_price = 0
+            invested = holding["quantity"] * holding["purchase_price"]
+            value = holding["quantity"] * current_price
+            yield (holding["symbol"], holding["quantity"], f"{holding['purchase_price']:,.2f}",
+                   f"{current_price:,.2f}", f"{value:,.2f}", f"{value - invested:+,.2f}")
+
+    _table(pdf, ("Symbol", "Qty", "Buy Price", "Price", "Value", "P/L"),
+           (40, 20, 30, 30, 35, 35), rows())
+
+
+def _render_expenses(pdf, data):
+    _section_page(pdf)
+    _section_title(pdf, "expenses")
+    records = data["expense_records"]
+    if not records:
+        _note(pdf, "No expenses recorded.")
+        return
+
+    by_month = defaultdict(lambda: defaultdict(float))
+    for record in records:
+        by_month[record["date"].strftime("%Y-%m")][record["category"]] += record["amount"]
+    months = sorted(by_month)
+    categories = sorted({category for month in by_month.values() for category in month})
+    totals = {category: [by_month[month].get(category, 0) for month in months] for category in categories}
+
+    chart_width = 170
+    pdf.image(create_expense_chart(months, categories, totals, width_mm=chart_width), x=20, w=chart_width)
+    pdf.ln(5)
+    rows = ((month, category, f"{amount:,.2f}")
+            for month in months
+            for category, amount in sorted(by_month[month].items()))
+    _table(pdf, ("Month", "Category", "Amount (INR)"), (40, 80, 60), rows)
+
+
+def _render_credit(pdf, data):
+    _section_page(pdf)
+    _section_title(pdf, "credit")
+    projection = data["credit_projection"]
+    if not projection:
+        _note(pdf, "Run the CIBIL score analysis to include a projection.")
+        return
+    chart_width = 170
+    pdf.image(create_credit_chart(projection, width_mm=chart_width), x=20, w=chart_width)
+    pdf.ln(5)
+    start = datetime.now()
+    rows = (((start + timedelta(days=30 * month)).strftime("%b %Y"), score)
+            for month, score in enumerate(projection))
+    _table(pdf, ("Month", "Projected Score"), (60, 60), rows)
+
+
+def _render_amortization(pdf, data):
+    _section_page(pdf)
+    _section_title(pdf, "amortization")
+    loan = data["loan"]
+    if not loan or loan["monthly_payment"] <= 0:
+        _note(pdf, "No debt repayment plan entered.")
+        return
+    pdf.set_font(pdf.report_font, size=11)
+    pdf.cell(0, 8, f"Principal: INR {loan['principal']:,.2f}  |  Monthly payment: INR {loan['monthly_payment']:,.2f}"
+                   f"  |  Interest: {loan['annual_rate']:.2f}% p.a.", ln=True)
+    schedule = amortization_schedule(loan["principal"], loan["monthly_payment"], loan["annual_rate"])
+    rows = ((month, f"{payment:,.2f}", f"{principal:,.2f}", f"{interest:,.2f}", f"{balance:,.2f}")
+            for month, payment, principal, interest, balance in schedule)
+    _table(pdf, ("Month", "Payment", "Principal", "Interest", "Balance"), (20, 40, 40, 40, 50), rows)
+
+
+SECTION_RENDERERS = {
+    "summary": _render_summary,
+    "advice": _render_advice,
+    "portfolio": _render_portfolio,
+    "expenses": _render_expenses,
+    "credit": _render_credit,
+    "amortization": _render_amortization,
+}
+
+
+def generate_pdf_report(income, savings, debt, expenses, advice, sections=DEFAULT_SECTIONS,
+                        portfolio=(), expense_records=(), credit_projection=(), loan=None):
+    data = {
+        "income": income, "savings": savings, "debt": debt, "expenses": expenses, "advice": advice,
+        "portfolio": portfolio, "expense_records": expense_records,
+        "credit_projection": credit_projection, "loan": loan,
+    }
+    pdf = _new_pdf()
+    pdf.set_auto_page_break(auto=True, margin=20)
+    pdf.add_page()
+
+    # Add header with border
+    pdf.set_fill_color(240, 240, 240)
+    pdf.rect(5, 5, 200, 25, style='F')
+    pdf.set_font(pdf.report_font, 'B', 16)
+    pdf.cell(200, 10, "AI FINANCE ADVISOR REPORT", ln=True, align='C')
+    pdf.set_font(pdf.report_font, 'I', 10)
+    pdf.cell(200, 5, f"Date: {datetime.now().strftime('%B %d, %Y %I:%M %p')}", ln=True, align='C')
+    pdf.ln(15)
+
+    # Only the requested sections are rendered, one after another; tables are fed
+    # by generators and charts come from the renderer's cache
+    for key in REPORT_SECTIONS:
+        if key in sections:
+            SECTION_RENDERERS[key](pdf, data)
+            pdf.section_page = pdf.page_no()
+
+    # Finalize PDF; fpdf2 returns the document as a bytearray
+    return io.BytesIO(bytes(pdf.output()))
+
+
+def _render_report(report_args):
+    # Runs in a worker process; bytes pickle cheaply back to the server
+    return generate_pdf_report(**report_args).getvalue()
+
+
+class ReportQueue:
+    # Renders reports in a process pool so PDF/chart work never runs on a
+    # Streamlit script thread; results are held by job id until expired
+    def __init__(self, max_workers=REPORT_WORKERS, result_ttl=REPORT_RESULT_TTL_SECONDS):
+        self.max_workers = max_workers
+        self.result_ttl = result_ttl
+        self._pool = self._new_pool()
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _new_pool(self):
+        # spawn: forking the threaded Streamlit server is not safe
+        return ProcessPoolExecutor(max_workers=self.max_workers,
+                                   mp_context=multiprocessing.get_context("spawn"))
+
+    def _replace_pool(self, broken):
+        # A worker died (OOM kill, segfault): every job on that pool has already
+        # failed with BrokenProcessPool, and the pool accepts no new work
+        with self._lock:
+            if self._pool is broken:
+                broken.shutdown(wait=False, cancel_futures=True)
+                self._pool = self._new_pool()
+
+    def submit(self, **report_args):
+        job_id = uuid.uuid4().hex
+        pool = self._pool
+        try:
+            future = pool.submit(_render_report, report_args)
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            pool = self._pool
+            future = pool.submit(_render_report, report_args)
+        with self._lock:
+            self._expire()
+            self._jobs[job_id] = (future, pool, time.monotonic())
+        return job_id
+
+    def status(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return "unknown"
+        future, pool, _ = job
+        if not future.done():
+            return "running" if future.running() else "pending"
+        error = future.exception()
+        if isinstance(error, BrokenProcessPool):
+            self._replace_pool(pool)
+        return "failed" if error is not None else "done"
+
+    def result(self, job_id):
+        with self._lock:
+            future, pool, _ = self._jobs[job_id]
+        try:
+            return future.result()
+        except BrokenProcessPool:
+            self._replace_pool(pool)
+            raise
+
+    def discard(self, job_id):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.result_ttl
+        for job_id, (future, _, submitted_at) in list(self._jobs.items()):
+            if future.done() and submitted_at < cutoff:
+                del self._jobs[job_id]